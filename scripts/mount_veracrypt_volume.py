@@ -5,26 +5,45 @@ Mounts a Veracrypt volume with a Linux filesystem in Windows or Linux.
 
 Volume settings are loaded via a .ini config file or via the command-line.
 
-Since Python does not support subprocess interaction, Veracrypt is launched separately.
+Veracrypt is launched separately, with the volume password written to its stdin.
+When protecting a hidden volume, Veracrypt instead prompts for all credentials on the terminal.
 
 Inspired by Aheno Barbus's PowerShell script on SourceForge:
 (See https://sourceforge.net/p/veracrypt/discussion/technical/thread/027f5f92bf/)
 """
 
-import argparse
-from configparser import ConfigParser
-from getpass import getpass
+from functools import lru_cache
 import logging
+from os import environ, fspath, stat
+from os.path import isabs, isfile
 from pathlib import Path
 from shutil import which
 from subprocess import CompletedProcess, PIPE, Popen, run
-from sys import argv, platform
-from typing import Dict, List
+from sys import argv, platform, stdin
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, TYPE_CHECKING
 
-if platform == "linux":
-    from os import getuid
-if platform == "win32":
-    from ctypes import windll
+# Imported lazily where used, to keep the import cost of this module low
+if TYPE_CHECKING:
+    import argparse
+
+IS_LINUX: bool = platform == "linux"
+IS_WINDOWS: bool = platform == "win32"
+
+if IS_LINUX:
+    from os import geteuid
+if IS_WINDOWS:
+    from ctypes import c_int, WinDLL
+
+    # Resolved once at import, rather than through windll on every admin check
+    _is_user_an_admin = WinDLL("shell32").IsUserAnAdmin
+    _is_user_an_admin.restype = c_int
+
+
+VERACRYPT_SECTION_NAME: str = "Veracrypt"
+
+LSBLK_COLUMNS: List[str] = ["NAME", "SIZE", "TYPE", "MOUNTPOINT"]
+PHYSICAL_DRIVE_COLUMNS: List[str] = ["DeviceID", "Model", "Size"]
 
 
 class AdminError(Exception):
@@ -35,72 +54,256 @@ class ConfigError(Exception):
     """Raised when this script finds an error with its configuration."""
 
 
+@lru_cache(maxsize=16)
+def build_linux_mount_point(slot_num: str) -> str:
+    """Builds the Linux mount point for a given Veracrypt slot number."""
+    return Path("/media", f"veracrypt{slot_num}").as_posix()
+
+
+@lru_cache(maxsize=16)
 def build_physical_drive_name(physical_drive_number: int) -> str:
     """Builds a WSL physical drive name from a given drive number."""
     return f"PHYSICALDRIVE{physical_drive_number}"
 
 
 def build_veracrypt_cmdline(config_data: Dict[str, str]) -> List[str]:
-    """Builds command-line call for veracrypt on both Linux and Windows."""
+    """
+    Builds command-line call for veracrypt on both Linux and Windows.
+    The volume password is not included; Veracrypt reads it from stdin instead.
+    When protecting a hidden volume, Veracrypt prompts for the passwords on the terminal.
+    """
+    # Each SectionProxy lookup goes through the config parser, so look up each setting once
     slot_num: str = config_data.get("slot_num", "1")
-    cmdline = [
+    keyfile_path: str = config_data.get("keyfile_path")
+    personal_iterations_multiplier: str = config_data.get(
+        "personal_iterations_multiplier"
+    )
+    # Veracrypt only accepts lowercase 'yes' or 'no'
+    using_hidden_partition: str = (
+        config_data.get("using_hidden_partition") or "no"
+    ).lower()
+    drive_partition: str = config_data.get("drive_partition")
+    wsl_prefix: List[str] = []
+    mount_options: List[str] = []
+    truecrypt_options: List[str] = []
+    mount_point: List[str] = []
+    # stdin only carries the password, so fail instead of prompting for anything else
+    password_options: List[str] = ["--non-interactive", "--stdin"]
+
+    # Hidden volume protection needs more credentials, so let Veracrypt prompt for them all
+    if uses_hidden_partition(config_data):
+        password_options = []
+
+    if config_data.getboolean("use_truecrypt"):
+        truecrypt_options = ["-tc"]
+
+    if IS_WINDOWS:
+        drive_num: int = config_data.get("physical_drive_num")
+
+        wsl_prefix = [config_data.get("wsl_exe")]
+        # WSL doesn't support hardware cryptography
+        mount_options = ["-m=nokernelcrypto"]
+        mount_point = [build_wsl_mount_point(drive_num)]
+
+    if IS_LINUX:
+        mount_point = [build_linux_mount_point(slot_num)]
+
+    # Built in its final order, so the partition and mount point are always the last arguments
+    return [
+        *wsl_prefix,
         "veracrypt",
-        "-t",  # Run interactively to prompt for any missing settings
-        f"--keyfiles={config_data.get('keyfile_path')}",
-        f"--password={config_data.get('volume_password')}",
-        f"--pim={config_data.get('personal_iterations_multiplier')}",
-        f"--protect-hidden={config_data.get('using_hidden_partition')}",
+        "-t",  # Use Veracrypt's text interface
+        *mount_options,
+        *truecrypt_options,
+        *password_options,
+        f"--keyfiles={keyfile_path}",
+        f"--pim={personal_iterations_multiplier}",
+        f"--protect-hidden={using_hidden_partition}",
         f"--slot={slot_num}",
-        f"{config_data.get('drive_partition')}",
+        f"{drive_partition}",
+        *mount_point,
     ]
 
-    if config_data.getboolean("use_truecrypt"):
-        cmdline.insert(3, "-tc")
 
-    if platform == "win32":
-        drive_num: int = config_data.get("physical_drive_num")
-        wsl_exe: str = config_data.get("wsl_exe")
-        mount_point_windows: Path = Path(
-            "/mnt", "wsl", build_physical_drive_name(drive_num)
-        )
+@lru_cache(maxsize=16)
+def build_wsl_mount_point(physical_drive_number: int) -> str:
+    """Builds the mount point within WSL for a given physical drive number."""
+    return Path(
+        "/mnt", "wsl", build_physical_drive_name(physical_drive_number)
+    ).as_posix()
+
 
-        cmdline.insert(0, wsl_exe)
-        cmdline.insert(
-            3, "-m=nokernelcrypto"
-        )  # WSL doesn't support hardware cryptography
-        cmdline.append(mount_point_windows.as_posix())
+def create_mount_point(mount_point: Path) -> None:
+    """Creates the directory for the given mount point if it does not already exist."""
+    logging.getLogger().info("Ensuring mount point exists at '%s'...", mount_point)
+    mount_point.mkdir(parents=True, exist_ok=True)
 
-    if platform == "linux":
-        mount_point_linux: Path = Path("/media", f"veracrypt{slot_num}")
-        cmdline.append(mount_point_linux.as_posix())
 
-    return cmdline
+def flatten_block_devices(
+    block_devices: List[Dict[str, Any]], depth: int = 0
+) -> List[Dict[str, Any]]:
+    """
+    Flattens the nested block device tree output by 'lsblk --json' into a list of rows.
+    Child devices (e.g. partitions) have their names indented beneath their parents.
+    """
+    rows: List[Dict[str, Any]] = []
+    for block_device in block_devices:
+        row = dict(block_device)
+        row["name"] = f"{'  ' * depth}{row.get('name', '')}"
+        rows.append(row)
+        rows.extend(flatten_block_devices(block_device.get("children", []), depth + 1))
+    return rows
+
+
+def format_failed_command(result: CompletedProcess[str]) -> str:
+    """
+    Formats the results of a command whose output could not be parsed.
+    The raw output is included, so users can still read what the command reported.
+    """
+    output = f"{result.stdout}{result.stderr}".strip()
+    return f"""(Unable to parse the output of '{result.args[0]}', which exited with code {result.returncode})
+{output}"""
+
+
+def format_table(rows: List[Dict[str, Any]], columns: List[str]) -> str:
+    """
+    Formats the given rows into a human-readable table with the given columns.
+    Column names are matched against the row keys case-insensitively.
+    """
+    if not rows:
+        return "(None detected)"
+
+    table: List[List[str]] = [columns]
+    for row in rows:
+        lowered_row = {key.lower(): value for key, value in row.items()}
+        cells = [lowered_row.get(column.lower()) for column in columns]
+        table.append(["" if cell is None else str(cell) for cell in cells])
+
+    widths = [max(len(line[index]) for line in table) for index in range(len(columns))]
+    return "\n".join(
+        "  ".join(cell.ljust(width) for cell, width in zip(line, widths)).rstrip()
+        for line in table
+    )
+
+
+@lru_cache(maxsize=4)
+def _which_cached(executable: str, path_env: Optional[str]) -> Optional[str]:
+    """Resolves the given executable in the given PATH, caching the result per PATH value."""
+    return which(executable, path=path_env)
+
+
+def find_executable(executable: str) -> bool:
+    """
+    Returns whether the given executable can be found.
+    Absolute paths to existing files are accepted directly.
+    Anything else goes through which(), which also tries PATHEXT suffixes on Windows.
+    """
+    if isabs(executable) and isfile(executable):
+        return True
+    return _which_cached(executable, environ.get("PATH")) is not None
 
 
 def have_admin_rights() -> bool:
     """Returns whether this script is running with administrative rights."""
-    if platform == "linux":
-        return getuid() == 0
-    if platform == "win32":
-        return windll.shell32.IsUserAnAdmin() != 0
+    if IS_LINUX:
+        return geteuid() == 0
+    if IS_WINDOWS:
+        return _is_user_an_admin() != 0
     return False
 
 
-def load_config_file(config_path: Path) -> Dict[str, str]:
+def list_physical_drives() -> str:
     """
-    Loads the config file at the given path, returning the configuration data.
-    The data returned will be contained in a name:value dictionary.
-    If the config file's sections are incorrect, a ConfigError will be raised.
+    Lists the physical drives detected by Windows, returning them as a human-readable table.
+    """
+    powershell_result = run(
+        [
+            "powershell.exe",
+            "-NoProfile",
+            "-Command",
+            # Piped output otherwise uses the console code page rather than UTF-8
+            "[Console]::OutputEncoding=[Text.Encoding]::UTF8; "
+            f"Get-CimInstance Win32_DiskDrive | Select-Object {','.join(PHYSICAL_DRIVE_COLUMNS)} | ConvertTo-Json -Compress",
+        ],
+        stdout=PIPE,
+        stderr=PIPE,
+        encoding="utf-8",
+        errors="replace",
+    )
+    physical_drives = parse_json_output(powershell_result.stdout)
+    if physical_drives is None:
+        # ConvertTo-Json outputs nothing at all when no drives exist
+        if powershell_result.returncode != 0 or powershell_result.stdout.strip():
+            return format_failed_command(powershell_result)
+        physical_drives = []
+    # ConvertTo-Json outputs a bare object rather than a list when only one drive exists
+    if isinstance(physical_drives, dict):
+        physical_drives = [physical_drives]
+    return format_table(physical_drives, PHYSICAL_DRIVE_COLUMNS)
+
+
+@lru_cache(maxsize=8)
+def _read_config_section(
+    config_path_str: str, mtime_ns: int, size: int
+) -> Mapping[str, str]:
+    """
+    Reads the Veracrypt section of the config file at the given path.
+    Results are cached by path, modification time and size, so the file is only read and tokenised again when it changes.
+    The returned mapping is read-only, since it is shared between callers.
     """
-    VERACRYPT_SECTION_NAME: str = "Veracrypt"
+    from configparser import ConfigParser
 
     config = ConfigParser()
-    config.read(str(config_path))
+    try:
+        # utf-8-sig also accepts files saved with a byte order mark (e.g. by Notepad)
+        with open(config_path_str, "r", encoding="utf-8-sig") as config_file:
+            config.read_file(config_file)
+    except UnicodeDecodeError as decode_error:
+        raise ConfigError(
+            f"""Unable to read config file '{config_path_str}': {decode_error}
+Please save the config file with UTF-8 encoding."""
+        ) from decode_error
+    except OSError as os_error:
+        raise ConfigError(
+            f"Unable to read config file '{config_path_str}': {os_error}"
+        ) from os_error
     if not VERACRYPT_SECTION_NAME in config:
         raise ConfigError(
             f"Section [{VERACRYPT_SECTION_NAME}] not found in config file!"
         )
 
+    return MappingProxyType(dict(config.items(VERACRYPT_SECTION_NAME, raw=True)))
+
+
+def load_config_file(config_path: Path) -> Dict[str, str]:
+    """
+    Loads the config file at the given path, returning the configuration data.
+    The data returned will be contained in a name:value dictionary.
+    If the config file is missing or its sections are incorrect, a ConfigError will be raised.
+    On a cache hit the file is not read again, but a fresh ConfigParser is still built from the cached values.
+    """
+    from configparser import ConfigParser
+
+    # Convert the path once; the cache key and the stat call both use the string form
+    config_path_str: str = fspath(config_path)
+    try:
+        config_stat = stat(config_path_str)
+    except FileNotFoundError as not_found_error:
+        raise ConfigError(
+            f"Config file '{config_path_str}' not found!"
+        ) from not_found_error
+    except OSError as os_error:
+        raise ConfigError(
+            f"Unable to read config file '{config_path_str}': {os_error}"
+        ) from os_error
+
+    section_data: Mapping[str, str] = _read_config_section(
+        config_path_str, config_stat.st_mtime_ns, config_stat.st_size
+    )
+
+    # Callers may modify the returned data, so hand out a fresh copy of the cached section
+    config = ConfigParser()
+    config.read_dict({VERACRYPT_SECTION_NAME: section_data})
     return config[VERACRYPT_SECTION_NAME]
 
 
@@ -121,9 +324,56 @@ def mount_physical_drive(drive_num: int, wsl_exe: str) -> CompletedProcess[bytes
     )
 
 
+def parse_boolean(value: str) -> bool:
+    """
+    Parses the given boolean setting value the same way ConfigParser.getboolean() does.
+    Raises a ValueError if the value is not a recognised boolean.
+    """
+    from configparser import ConfigParser
+
+    if value.lower() not in ConfigParser.BOOLEAN_STATES:
+        raise ValueError(f"Not a boolean: {value}")
+    return ConfigParser.BOOLEAN_STATES[value.lower()]
+
+
+def parse_json_output(output: str) -> Any:
+    """
+    Parses the JSON output of a subprocess.
+    Returns None if the output is empty or is not valid JSON.
+    """
+    import json
+
+    try:
+        return json.loads(output)
+    except ValueError:
+        return None
+
+
+def parse_yes_no(value: str) -> bool:
+    """
+    Parses the given 'yes' or 'no' setting value, as accepted by Veracrypt's options.
+    Raises a ValueError for any other value.
+    """
+    if value.lower() not in ("yes", "no"):
+        raise ValueError(f"Not 'yes' or 'no': {value}")
+    return value.lower() == "yes"
+
+
 def pause_for_input() -> None:
-    """Pauses the script for users to read by waiting for user input."""
-    input("Press any key to exit...")
+    """
+    Pauses the script for users to read by waiting for user input.
+    Does nothing when stdin is not a terminal, since there is no user to wait for.
+    """
+    if stdin.isatty():
+        input("Press any key to exit...")
+
+
+def uses_hidden_partition(config_data: Dict[str, str]) -> bool:
+    """
+    Returns whether the given configuration data protects a hidden volume.
+    The data is expected to be validated already, so the setting is 'yes', 'no' or unset.
+    """
+    return (config_data.get("using_hidden_partition") or "no").lower() == "yes"
 
 
 def validate_config_data(config_data: Dict[str, str]) -> None:
@@ -133,10 +383,40 @@ def validate_config_data(config_data: Dict[str, str]) -> None:
     """
     DRIVE_PARTITION_CONFIG_NAME: str = "drive_partition"
     DRIVE_NUM_CONFIG_NAME: str = "physical_drive_num"
+    HIDDEN_PARTITION_CONFIG_NAME: str = "using_hidden_partition"
+    WHOLE_NUMBER_DESCRIPTION: str = "a whole number [e.g. '0']"
+    # Maps each typed setting to the converter that checks it and a description of its values
+    TYPED_CONFIG_VALUES: Dict[str, Tuple[Callable[[str], Any], str]] = {
+        "personal_iterations_multiplier": (int, WHOLE_NUMBER_DESCRIPTION),
+        "slot_num": (int, WHOLE_NUMBER_DESCRIPTION),
+        "use_truecrypt": (parse_boolean, "a boolean value [e.g. 'true' or 'false']"),
+        HIDDEN_PARTITION_CONFIG_NAME: (parse_yes_no, "'yes' or 'no'"),
+    }
+    # Only checked on Windows, since other platforms ignore these settings
+    WINDOWS_TYPED_CONFIG_VALUES: Dict[str, Tuple[Callable[[str], Any], str]] = {
+        DRIVE_NUM_CONFIG_NAME: (int, WHOLE_NUMBER_DESCRIPTION),
+    }
     WSL_EXE_CONFIG_NAME: str = "wsl_exe"
     WSL_ROOT_CONFIG_NAME: str = "wsl_root"
 
-    if platform == "win32":
+    typed_config_values = dict(TYPED_CONFIG_VALUES)
+    if IS_WINDOWS:
+        typed_config_values.update(WINDOWS_TYPED_CONFIG_VALUES)
+
+    # Each typed setting is parsed once here; later checks rely on it being valid
+    for config_name, (converter, description) in typed_config_values.items():
+        config_value: str = config_data.get(config_name)
+        if not config_value:
+            continue
+        try:
+            converter(config_value)
+        except ValueError:
+            raise ConfigError(
+                f"""{config_name.upper()} is set to '{config_value}'!
+Please set it to {description}."""
+            )
+
+    if IS_WINDOWS:
         if not config_data.get(WSL_ROOT_CONFIG_NAME):
             raise ConfigError(
                 f"""{WSL_ROOT_CONFIG_NAME.upper()} is not set!
@@ -145,33 +425,48 @@ Please set it to WSL's root share path for the current distribution [e.g. '\\\\w
 
         config_data[WSL_EXE_CONFIG_NAME] = config_data.get(WSL_EXE_CONFIG_NAME, "wsl")
         wsl_path: str = config_data[WSL_EXE_CONFIG_NAME]
-        if not which(wsl_path):
+        if not find_executable(wsl_path):
             raise ConfigError(
                 f"""Unable to find Windows Subsystem for Linux executable at '{wsl_path}'!
 Please make sure WSL is installed at the path set for {WSL_EXE_CONFIG_NAME.upper()} in the config file."""
             )
 
+        # The drive number is needed to mount the drive even when the partition is known,
+        # so it is always required; the drive listing only runs when it is missing.
         if not config_data.get(DRIVE_NUM_CONFIG_NAME):
-            wmic_result = run(["wmic.exe", "diskdrive", "list", "brief"], stdout=PIPE)
-            wmic_drive_list = wmic_result.stdout.decode()
             raise ConfigError(
                 f"""{DRIVE_NUM_CONFIG_NAME.upper()} is not set!
 Please set it to the DeviceID for the drive containing the Veracrypt volume. [e.g. '0' for 'PHYSICALDRIVE0'].
 Currently detected physical drives:
-{wmic_drive_list}"""
+{list_physical_drives()}"""
             )
 
     if not config_data.get(DRIVE_PARTITION_CONFIG_NAME):
-        lsblk_cmdline: List[str] = ["lsblk"]
+        lsblk_cmdline: List[str] = ["lsblk", "--json", "-o", ",".join(LSBLK_COLUMNS)]
 
         # In Windows, we need to mount the drive first and prepend WSL to the command
-        if platform == "win32":
+        # 'wsl --mount' is an option of wsl.exe itself, so it can't be chained into the lsblk call
+        if IS_WINDOWS:
             wsl_path: str = config_data[WSL_EXE_CONFIG_NAME]
             mount_physical_drive(config_data[DRIVE_NUM_CONFIG_NAME], wsl_path)
             lsblk_cmdline.insert(0, wsl_path)
 
-        lsblk_result = run(lsblk_cmdline, stdout=PIPE)
-        partition_list = lsblk_result.stdout.decode()
+        lsblk_result = run(
+            lsblk_cmdline,
+            stdout=PIPE,
+            stderr=PIPE,
+            encoding="utf-8",
+            errors="replace",
+        )
+        lsblk_output = parse_json_output(lsblk_result.stdout)
+        if isinstance(lsblk_output, dict):
+            partition_list = format_table(
+                flatten_block_devices(lsblk_output.get("blockdevices", [])),
+                LSBLK_COLUMNS,
+            )
+        else:
+            # e.g. lsblk failed, or is too old to support --json
+            partition_list = format_failed_command(lsblk_result)
         raise ConfigError(
             f"""{DRIVE_PARTITION_CONFIG_NAME.upper()} is not set!
 Please set it to the Linux partition of the Veracrypt volume [e.g. '/dev/sda1'].
@@ -179,35 +474,52 @@ Currently detected Linux partitions:
 {partition_list}"""
         )
 
-    if not config_data.get("volume_password"):
-        config_data["volume_password"] = getpass(prompt="Enter Volume Password: ")
+    # Veracrypt prompts for the passwords itself when protecting a hidden volume
+    if not config_data.get("volume_password") and not uses_hidden_partition(
+        config_data
+    ):
+        # getpass() can only prompt on a terminal, so read piped passwords from stdin
+        if stdin.isatty():
+            from getpass import getpass
+
+            volume_password: str = getpass(prompt="Enter Volume Password: ")
+        else:
+            password_line: str = stdin.readline()
+            if not password_line:
+                raise ConfigError(
+                    "VOLUME_PASSWORD is not set, and no password was given on stdin!"
+                )
+            volume_password = password_line.rstrip("\n")
+        # Escape '%' so the config parser's interpolation returns the password unchanged
+        config_data["volume_password"] = volume_password.replace("%", "%%")
 
 
 def main(config_path: Path) -> int:
     """
     Contains the main functionality of this script.
     """
-    log_formatter = logging.Formatter("%(levelname)s: %(message)s")
-    stream_handler = logging.StreamHandler()
-    stream_handler.setFormatter(log_formatter)
+    # Replaces any existing handlers, so repeated calls do not duplicate log output
+    logging.basicConfig(
+        format="%(levelname)s: %(message)s", level=logging.INFO, force=True
+    )
     logger = logging.getLogger()
-    logger.addHandler(stream_handler)
-    logger.setLevel(logging.INFO)
 
     try:
         if not have_admin_rights():
             raise AdminError
 
-        logger.info(f"Loading configuration from config file '{config_path.name}'...")
+        logger.info("Loading configuration from config file '%s'...", config_path.name)
         config_data: Dict[str, str] = load_config_file(config_path)
         for config_name, config_value in config_data.items():
             config_value = (
                 "******" if (config_name == "volume_password") else config_value
             )
-            logger.debug(f"{config_name}={config_value}")
+            logger.debug("%s=%s", config_name, config_value)
         validate_config_data(config_data)
 
-        if platform == "win32":
+        if IS_WINDOWS:
+            from concurrent.futures import ThreadPoolExecutor
+
             drive_num: int = config_data.get("physical_drive_num")
             mount_point_windows: Path = Path(
                 config_data.get("wsl_root"),
@@ -216,47 +528,62 @@ def main(config_path: Path) -> int:
                 build_physical_drive_name(drive_num),
             )
 
-            if not mount_point_windows.exists():
-                logger.info(f"Creating mount point at '{mount_point_windows}'...")
-                Path.mkdir(mount_point_windows)
-
-            logger.info(f"Mounting Veracrypt drive at drive number '{drive_num}'...")
-            mount_physical_drive(drive_num, config_data.get("wsl_exe"))
+            # Creating the mount point doesn't depend on the drive mount,
+            # so run it while WSL is starting up to mount the drive
+            logger.info("Mounting Veracrypt drive at drive number '%s'...", drive_num)
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                mount_point_future = executor.submit(
+                    create_mount_point, mount_point_windows
+                )
+                mount_future = executor.submit(
+                    mount_physical_drive, drive_num, config_data.get("wsl_exe")
+                )
+                mount_point_future.result()
+                mount_future.result()
 
         veracrypt_cmdline = build_veracrypt_cmdline(config_data)
-        # NOTE: DO NOT log or print command line args
-        # The password may be in plaintext on the command line!
-        veracrypt_cmdline_len = len(veracrypt_cmdline)
-        drive_partition: str = veracrypt_cmdline[veracrypt_cmdline_len - 2]
-        mount_point: str = veracrypt_cmdline[veracrypt_cmdline_len - 1]
+        # NOTE: DO NOT log or print the volume password!
+        # It is written to Veracrypt's stdin (or typed into Veracrypt's own prompt),
+        # so it never appears on the command line.
+        *_, drive_partition, mount_point = veracrypt_cmdline
         logger.info(
-            f"Mounting Veracrypt volume '{drive_partition}' to '{mount_point}'..."
+            "Mounting Veracrypt volume '%s' to '%s'...", drive_partition, mount_point
         )
-        veracrypt_cmdline_str = " ".join(veracrypt_cmdline)
 
-        # Since Python doesn't support subprocess interaction, launch in a separate shell.
-        veracrypt_process = Popen(veracrypt_cmdline_str, shell=True)
+        # The argument list is passed directly, so no intermediate shell is spawned.
         # Wait for the mounting to finish, since on Linux closing early might stop the mount.
-        veracrypt_process.wait()
+        if uses_hidden_partition(config_data):
+            # Veracrypt inherits the terminal, so it can prompt for the hidden volume's credentials
+            veracrypt_process = Popen(veracrypt_cmdline, shell=False, close_fds=True)
+            veracrypt_process.wait()
+        else:
+            # Launch Veracrypt as a separate process, writing the password to its stdin
+            veracrypt_process = Popen(
+                veracrypt_cmdline, stdin=PIPE, shell=False, close_fds=True
+            )
+            volume_password: str = config_data.get("volume_password", "")
+            veracrypt_process.communicate(f"{volume_password}\n".encode())
         return 0
 
     except AdminError:
-        logger.error(f"This script requires administrative rights to mount volumes.")
-        logger.error(f"Please re-run this script as an administrator or as root.")
+        logger.error("This script requires administrative rights to mount volumes.")
+        logger.error("Please re-run this script as an administrator or as root.")
         pause_for_input()
         return -1
 
     except ConfigError as config_error:
         logger.error("An error has been detected in the configuration file:")
-        logger.error(f"{config_error}")
+        logger.error("%s", config_error)
         pause_for_input()
         return -2
 
 
-def parse_arguments(arguments: List[str]) -> argparse.Namespace:
+def parse_arguments(arguments: List[str]) -> "argparse.Namespace":
     """
     Parses command-line arguments into namespace data.
     """
+    import argparse
+
     parser = argparse.ArgumentParser(
         description="Mounts a Veracrypt volume with a Linux filesystem in Windows or Linux."
     )